@@ -1,9 +1,63 @@
 import meshio
+import numpy as np
+from numba import njit, prange
+
+
+@njit("void(float32[:, ::1], float32)", cache=True, parallel=True, fastmath=True)
+def _normalize_inplace(points, target_height):
+    # Serial pre-pass for the z-range, then one parallel pass to apply the scale.
+    z_min = points[0, 2]
+    z_max = points[0, 2]
+    for i in range(points.shape[0]):
+        z = points[i, 2]
+        if z < z_min:
+            z_min = z
+        if z > z_max:
+            z_max = z
+    coeff = target_height / (z_max - z_min)
+    for i in prange(points.shape[0]):
+        points[i, 0] *= coeff
+        points[i, 1] *= coeff
+        points[i, 2] *= coeff
+
+
+@njit(cache=True)
+def _voxel_argmax(points, voxel_size):
+    # Open-addressing hash table keyed by voxel coordinates; each slot holds the
+    # index of the highest point seen so far in that voxel.
+    n_points = points.shape[0]
+    table_size = 1
+    while table_size < 2 * n_points:
+        table_size *= 2
+    mask = table_size - 1
+    slots = np.full(table_size, -1, np.int64)
+    keys = np.empty((table_size, 3), np.int64)
+    for i in range(n_points):
+        ix = np.int64(np.floor(points[i, 0] / voxel_size))
+        iy = np.int64(np.floor(points[i, 1] / voxel_size))
+        iz = np.int64(np.floor(points[i, 2] / voxel_size))
+        j = ((ix * 73856093) ^ (iy * 19349663) ^ (iz * 83492791)) & mask
+        while True:
+            k = slots[j]
+            if k == -1:
+                slots[j] = i
+                keys[j, 0] = ix
+                keys[j, 1] = iy
+                keys[j, 2] = iz
+                break
+            if keys[j, 0] == ix and keys[j, 1] == iy and keys[j, 2] == iz:
+                if points[i, 2] > points[k, 2]:
+                    slots[j] = i
+                break
+            j = (j + 1) & mask
+    kept = slots[slots >= 0]
+    kept.sort()
+    return kept
 
 
 def scan_from_index(path_scan):
     """
-    Load a 3D scan from a file and return its points as a list.
+    Load a 3D scan from a file and return its points as an array.
 
     Parameters
     ----------
@@ -12,14 +66,12 @@ def scan_from_index(path_scan):
 
     Returns
     -------
-    list of list of float
-        A list of points from the 3D scan, where each point is represented as a list of coordinates.
+    numpy.ndarray (shape: N × 3)
+        A C-contiguous float32 array of points from the 3D scan, where each row contains the coordinates of a point.
     """
 
     scan = meshio.read(path_scan)
-    scan = scan.points
-    scan = scan.tolist()
-    return scan
+    return np.ascontiguousarray(scan.points, dtype=np.float32)
 
 
 def scan_height(scan):
@@ -28,8 +80,8 @@ def scan_height(scan):
 
     Parameters
     ----------
-    scan : list of list of float
-        A list of points from the 3D scan, where each point is represented as a list of coordinates.
+    scan : array-like (shape: N × 3)
+        The points from the 3D scan, where each row contains the coordinates of a point.
 
     Returns
     -------
@@ -37,31 +89,64 @@ def scan_height(scan):
         The height of the 3D scan.
     """
 
-    z = [row[2] for row in scan]
-    return max(z) - min(z)
+    return np.ptp(np.asarray(scan)[:, 2])
 
 
-def scan_normalization(scan, target_height=1.7):
+def scan_normalization(scan, target_height=1.7, in_place=False):
     """
     Normalize the height of a 3D scan to a target value.
 
     Parameters
     ----------
-    scan : list of list of float
-        A list of points from the 3D scan, where each point is represented as a list of coordinates.
+    scan : array-like (shape: N × 3)
+        The points from the 3D scan, where each row contains the coordinates of a point.
 
     target_height : float, optional (default: 1.7)
         The target height to which the scan will be normalized.
 
+    in_place : bool, optional (default: False)
+        If True and `scan` is already a C-contiguous float32 array, scale it in place instead of working on a copy.
+
+    Returns
+    -------
+    numpy.ndarray (shape: N × 3)
+        A normalized float32 3D scan where the z-coordinates are scaled to the target height.
+    """
+
+    if in_place:
+        normalized_scan = np.ascontiguousarray(scan, dtype=np.float32)
+    else:
+        normalized_scan = np.array(scan, dtype=np.float32, order="C")
+    # The kernel runs without bounds checks and with fastmath, so degenerate scans are rejected here.
+    if normalized_scan.shape[0] == 0:
+        raise ValueError("Cannot normalize an empty scan.")
+    if scan_height(normalized_scan) == 0:
+        raise ValueError("Cannot normalize a scan with zero height.")
+    _normalize_inplace(normalized_scan, np.float32(target_height))
+    return normalized_scan
+
+
+def voxel_downsample(points, voxel_size=0.01):
+    """
+    Thin a point cloud by keeping a single point per cell of a regular voxel grid.
+
+    Within each non-empty voxel, the point with the highest z-coordinate is kept.
+
+    Parameters
+    ----------
+    points : array-like (shape: N × 3)
+        The input point cloud, where each row contains the coordinates of a point.
+
+    voxel_size : float, optional (default: 0.01)
+        The edge length of the cubic voxels.
+
     Returns
     -------
-    list of list of float
-        A normalized 3D scan where the z-coordinates are scaled to the target height.
+    numpy.ndarray (shape: M × 3)
+        The retained points, with M ≤ N, in their original order.
     """
 
-    scantemp = scan
-    coeff = target_height / scan_height(scan)
-    for i in range(len(scan)):
-        for j in range(3):
-            scantemp[i][j] = scantemp[i][j] * coeff
-    return scantemp
+    if not voxel_size > 0:
+        raise ValueError(f"voxel_size must be positive, got {voxel_size}.")
+    points = np.asarray(points)
+    return points[_voxel_argmax(points, voxel_size)]
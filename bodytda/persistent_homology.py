@@ -3,15 +3,84 @@ import gudhi.wasserstein as gw
 import matplotlib.pyplot as plt
 import numpy as np
 from gudhi.representations import Silhouette
+from joblib import Parallel, delayed
 
 
-def persistence_diagram(point_cloud, dimension=2, min_persistence=0.0003):
+class PersistenceEngine:
+    """
+    Reusable configuration for computing persistence diagrams of many point clouds with the Alpha complex.
+
+    Parameters
+    ----------
+    dimension : int, optional (default: 2)
+        The maximum homology dimension to compute persistence intervals for.
+
+    min_persistence : float, optional (default: 0.0003)
+        The minimum persistence value to filter out short-lived topological features.
+
+    voxel_size : float or None, optional (default: None)
+        If given, the point cloud is first thinned with `voxel_downsample` using this voxel size.
+
+    max_alpha_square : float, optional (default: inf)
+        The maximum filtration value of the simplices inserted in the simplex tree.
+        Intervals dying after this value are reported as infinite.
+    """
+
+    def __init__(self, dimension=2, min_persistence=0.0003, voxel_size=None, max_alpha_square=float("inf")):
+        self.dimension = dimension
+        self.min_persistence = min_persistence
+        self.voxel_size = voxel_size
+        self.max_alpha_square = max_alpha_square
+
+    def __call__(self, point_cloud):
+        """
+        Compute the persistence diagram of a point cloud.
+
+        Parameters
+        ----------
+        point_cloud : array-like (shape: N × d)
+            The input point cloud, where N is the number of points and d is the dimensionality.
+
+        Returns
+        -------
+        pdiagram : list of tuples
+            The persistence diagram, containing pairs (birth, death) of topological features.
+
+        pdiagram_decolor : list of numpy.ndarray
+            A list where the i-th entry contains the persistence intervals for homology dimension i,
+            as a contiguous float64 array of shape (N, 2) sorted by birth, then death.
+        """
+
+        points = np.asarray(point_cloud)
+        if self.voxel_size is not None:
+            # Imported here so that meshio and the Numba kernels are only loaded when thinning is requested.
+            from .mesh_utils import voxel_downsample
+
+            points = voxel_downsample(points, voxel_size=self.voxel_size)
+        # CGAL needs double precision for its predicates, so points are only upcast here.
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        rips_complex = gd.AlphaComplex(points=points)
+        simplex_tree = rips_complex.create_simplex_tree(max_alpha_square=self.max_alpha_square)
+        # GUDHI's own threshold is only used to drop zero-length intervals; the actual filtering is done below.
+        raw_pdiagram = simplex_tree.persistence(min_persistence=min(self.min_persistence, 0.0))
+        pairs = np.array([(dim, birth, death) for dim, (birth, death) in raw_pdiagram], dtype=np.float64).reshape(-1, 3)
+        keep = pairs[:, 2] - pairs[:, 1] > self.min_persistence
+        pdiagram = [pair for pair, kept in zip(raw_pdiagram, keep) if kept]
+        pairs = pairs[keep]
+        pairs = pairs[np.lexsort((pairs[:, 2], pairs[:, 1], pairs[:, 0]))]
+        pdiagram_decolor = [pairs[pairs[:, 0] == i, 1:] for i in range(self.dimension + 1)]
+        return pdiagram, pdiagram_decolor
+
+
+def persistence_diagram(
+    point_cloud, dimension=2, min_persistence=0.0003, voxel_size=None, max_alpha_square=float("inf")
+):
     """
     Compute the persistence diagram of a point cloud using the Alpha complex.
 
     Parameters
     ----------
-    point_cloud : list of list (shape: N × d)
+    point_cloud : array-like (shape: N × d)
         The input point cloud, where N is the number of points and d is the dimensionality.
 
     dimension : int, optional (default: 2)
@@ -20,25 +89,32 @@ def persistence_diagram(point_cloud, dimension=2, min_persistence=0.0003):
     min_persistence : float, optional (default: 0.0003)
         The minimum persistence value to filter out short-lived topological features.
 
+    voxel_size : float or None, optional (default: None)
+        If given, the point cloud is first thinned with `voxel_downsample` using this voxel size.
+
+    max_alpha_square : float, optional (default: inf)
+        The maximum filtration value of the simplices inserted in the simplex tree.
+
     Returns
     -------
     pdiagram : list of tuples
         The persistence diagram, containing pairs (birth, death) of topological features.
 
     pdiagram_decolor : list of numpy.ndarray
-        A list where the i-th entry contains the persistence intervals for homology dimension i.
+        A list where the i-th entry contains the persistence intervals for homology dimension i,
+        as a contiguous float64 array of shape (N, 2) sorted by birth, then death.
     """
 
-    rips_complex = gd.AlphaComplex(points=point_cloud)
-    simplex_tree = rips_complex.create_simplex_tree()
-    pdiagram = simplex_tree.persistence(min_persistence=min_persistence)
-    pdiagram_decolor = []
-    for i in range(dimension + 1):
-        pdiagram_decolor.append(simplex_tree.persistence_intervals_in_dimension(i))
-    return pdiagram, pdiagram_decolor
+    engine = PersistenceEngine(
+        dimension=dimension,
+        min_persistence=min_persistence,
+        voxel_size=voxel_size,
+        max_alpha_square=max_alpha_square,
+    )
+    return engine(point_cloud)
 
 
-def plot_persistence_diagram(pdiagram):
+def plot_persistence_diagram(pdiagram, axes=None):
     """
     Plot the persistence diagram and barcode of a given persistence diagram.
 
@@ -47,20 +123,53 @@ def plot_persistence_diagram(pdiagram):
     pdiagram : list of tuples
         The persistence diagram, containing pairs (birth, death) of topological features.
 
+    axes : sequence of two matplotlib.axes.Axes or None, optional (default: None)
+        The axes on which to draw the diagram and the barcode. If None, a new figure is created and shown.
+
     Returns
     -------
     None
         Displays the persistence diagram and barcode plot.
     """
 
-    plt.figure()
-    fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(12, 5))
+    show = axes is None
+    if show:
+        _, axes = plt.subplots(nrows=1, ncols=2, figsize=(12, 5))
     gd.plot_persistence_diagram(persistence=pdiagram, legend=True, axes=axes[0])
     gd.plot_persistence_barcode(pdiagram, axes=axes[1])
-    plt.show()
+    if show:
+        plt.show()
+
+
+def _imap(function, arguments, n_jobs):
+    # Even with a single job joblib adds a per-call cost comparable to small GUDHI computations,
+    # so the serial case does not go through it.
+    if n_jobs == 1:
+        return (function(*args) for args in arguments)
+    return Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator")(
+        delayed(function)(*args) for args in arguments
+    )
 
 
-def bottleneck_distance(pdiagram_decolor_1, pdiagram_decolor_2, dimension=2):
+def _as_intervals(intervals):
+    # No copy is made for intervals already prepared by `prepare_diagrams`.
+    return np.ascontiguousarray(intervals, dtype=np.float64).reshape(-1, 2)
+
+
+def _bottleneck_in_dimension(intervals_1, intervals_2):
+    # Against an empty diagram, every interval is matched to the diagonal.
+    intervals_1 = _as_intervals(intervals_1)
+    intervals_2 = _as_intervals(intervals_2)
+    if len(intervals_1) == 0 and len(intervals_2) == 0:
+        return 0.0
+    if len(intervals_1) == 0:
+        return 0.5 * np.max(intervals_2[:, 1] - intervals_2[:, 0])
+    if len(intervals_2) == 0:
+        return 0.5 * np.max(intervals_1[:, 1] - intervals_1[:, 0])
+    return gd.bottleneck_distance(intervals_1, intervals_2)
+
+
+def bottleneck_distance(pdiagram_decolor_1, pdiagram_decolor_2, dimension=2, upper_bound=None, n_jobs=1):
     """
     Compute the bottleneck distance between two persistence diagrams.
 
@@ -75,20 +184,33 @@ def bottleneck_distance(pdiagram_decolor_1, pdiagram_decolor_2, dimension=2):
     dimension : int, optional (default: 2)
         The maximum homology dimension to compute the bottleneck distance for.
 
+    upper_bound : float or None, optional (default: None)
+        If given, stop as soon as the distance in some dimension exceeds this value and return that partial maximum.
+
+    n_jobs : int, optional (default: 1)
+        The number of threads used to compute the distances of the different homology dimensions.
+        Values below 1 are treated as 1.
+
     Returns
     -------
     float
         The maximum bottleneck distance across all computed homology dimensions.
     """
 
-    distances = []
-    for i in range(dimension + 1):
-        distance = gd.bottleneck_distance(pdiagram_decolor_1[i], pdiagram_decolor_2[i])
-        distances.append(distance)
-    return max(distances)
+    distances = _imap(
+        _bottleneck_in_dimension,
+        ((pdiagram_decolor_1[i], pdiagram_decolor_2[i]) for i in range(dimension + 1)),
+        max(n_jobs, 1),
+    )
+    distance = 0.0
+    for distance_in_dimension in distances:
+        distance = max(distance, distance_in_dimension)
+        if upper_bound is not None and distance > upper_bound:
+            break
+    return distance
 
 
-def wasserstein_distance(pdiagram_decolor_1, pdiagram_decolor_2, p=2, order=2):
+def wasserstein_distance(pdiagram_decolor_1, pdiagram_decolor_2, p=2, order=2, n_jobs=1):
     """
     Compute the Wasserstein distance between two persistence diagrams.
 
@@ -106,37 +228,165 @@ def wasserstein_distance(pdiagram_decolor_1, pdiagram_decolor_2, p=2, order=2):
     order : int, optional (default: 2)
         The order of the Wasserstein distance, which determines the weight given to different features in the distance calculation.
 
+    n_jobs : int, optional (default: 1)
+        The number of threads used to compute the distances of the different homology dimensions.
+        Values below 1 are treated as 1.
+
     Returns
     -------
     float
         The Wasserstein distance between the two persistence diagrams.
     """
 
-    distances = []
-    for i in range(len(pdiagram_decolor_1)):
-        distance = gw.wasserstein_distance(
-            np.array(pdiagram_decolor_1[i]),
-            np.array(pdiagram_decolor_2[i]),
-            order=order,
-            internal_p=p,
-        )
-        distances.append(distance)
-    return np.power(sum(np.power(distance, p) for distance in distances), 1 / p)
+    distances = np.fromiter(
+        _imap(
+            lambda intervals_1, intervals_2: gw.wasserstein_distance(
+                _as_intervals(intervals_1), _as_intervals(intervals_2), order=order, internal_p=p
+            ),
+            zip(pdiagram_decolor_1, pdiagram_decolor_2),
+            max(n_jobs, 1),
+        ),
+        dtype=np.float64,
+        count=len(pdiagram_decolor_1),
+    )
+    return np.linalg.norm(distances, ord=p)
+
+
+def prepare_diagrams(pdiagram_decolors):
+    """
+    Convert a collection of persistence diagrams to contiguous float64 arrays once, for repeated distance computations.
+
+    Parameters
+    ----------
+    pdiagram_decolors : list of list of array-like
+        The persistence diagrams, where the i-th entry of each diagram contains the persistence intervals for homology dimension i.
+
+    Returns
+    -------
+    list of list of numpy.ndarray
+        The same diagrams, where each entry is a C-contiguous float64 array of shape (N, 2).
+    """
+
+    return [[_as_intervals(intervals) for intervals in pdiagram_decolor] for pdiagram_decolor in pdiagram_decolors]
+
+
+def pairwise_matrix(pdiagram_decolors, metric="bottleneck", n_jobs=-1, **kwargs):
+    """
+    Compute the matrix of pairwise distances between persistence diagrams.
 
+    Parameters
+    ----------
+    pdiagram_decolors : list of list of array-like
+        The persistence diagrams, ideally prepared with `prepare_diagrams`.
+
+    metric : {"bottleneck", "wasserstein"} or callable, optional (default: "bottleneck")
+        The distance between two diagrams. A callable must take two diagrams and return a float.
+
+    n_jobs : int, optional (default: -1)
+        The number of threads used to compute the distances of the different pairs of diagrams.
+        Negative values follow the joblib convention, -1 meaning one thread per CPU.
+
+    **kwargs
+        Additional keyword arguments passed to the metric.
+
+    Returns
+    -------
+    numpy.ndarray (shape: K × K)
+        The symmetric matrix of distances between the K diagrams.
+    """
+
+    if isinstance(metric, str):
+        if metric not in _METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {sorted(_METRICS)}.")
+        metric = _METRICS[metric]
+        kwargs.setdefault("n_jobs", 1)
+
+    n_diagrams = len(pdiagram_decolors)
+    pairs = [(i, j) for i in range(n_diagrams) for j in range(i + 1, n_diagrams)]
+    distances = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(metric)(pdiagram_decolors[i], pdiagram_decolors[j], **kwargs) for i, j in pairs
+    )
+    matrix = np.zeros((n_diagrams, n_diagrams))
+    for (i, j), distance in zip(pairs, distances):
+        matrix[i, j] = matrix[j, i] = distance
+    return matrix
+
+
+_METRICS = {"bottleneck": bottleneck_distance, "wasserstein": wasserstein_distance}
+
+
+def _vectorized_weight(function):
+    # Marks the weights defined in this module, which return the N weights of an (N, 2) array of intervals at once.
+    function._vectorized = True
+    return function
+
+
+@_vectorized_weight
+def _unit_weight(intervals):
+    return np.ones(np.shape(intervals)[:-1])
+
+
+@_vectorized_weight
+def _birth_weight(intervals):
+    return np.asarray(intervals)[..., 0]
+
+
+class _VectorizedSilhouette(Silhouette):
+    # Same computation as `Silhouette.transform`, but weights marked with `_vectorized_weight` are
+    # evaluated once on the whole (N, 2) array of intervals. Any other weight is evaluated per
+    # interval, as upstream does.
+
+    def _weights(self, diagram):
+        if getattr(self.weight, "_vectorized", False):
+            return self.weight(diagram)
+        return np.array([self.weight(point) for point in diagram], dtype=np.float64)
+
+    def transform(self, X):
+        Xfit = []
+        x_values = self.grid_
+        for diagram in X:
+            diagram = np.asarray(diagram, dtype=np.float64).reshape(-1, 2)
+            midpoints, heights = (diagram[:, 0] + diagram[:, 1]) / 2.0, (diagram[:, 1] - diagram[:, 0]) / 2.0
+            weights = self._weights(diagram)
+            total_weight = np.sum(weights)
+            tent_functions = np.maximum(heights[None, :] - np.abs(x_values[:, None] - midpoints[None, :]), 0.0)
+            Xfit.append(np.sum(weights[None, :] / total_weight * tent_functions, axis=1) * np.sqrt(2))
+        return np.stack(Xfit, axis=0)
+
+
+def silhouette(pdiagram_decolor, n0=25, n1=250, n2=250, weight=_birth_weight):
+    """
+    Compute the silhouette vectorization of a persistence diagram in homology dimensions 0, 1 and 2.
+
+    Parameters
+    ----------
+    pdiagram_decolor : list of numpy.ndarray
+        A list where the i-th entry contains the persistence intervals for homology dimension i.
+
+    n0, n1, n2 : int, optional (default: 25, 250, 250)
+        The resolution of the silhouette in homology dimensions 0, 1 and 2.
+
+    weight : callable, optional (default: birth of the interval)
+        The weight function applied to each interval in homology dimensions 1 and 2.
+
+    Returns
+    -------
+    numpy.ndarray (shape: n0 + n1 + n2)
+        The concatenation of the three silhouettes.
+    """
 
-def silhouette(pdiagram_decolor, n0=25, n1=250, n2=250, weight=lambda x: x[0]):
-    pdiagram_decolor_0 = [pdiagram_decolor[0][:-1]]
+    intervals_0 = np.asarray(pdiagram_decolor[0])
+    pdiagram_decolor_0 = [intervals_0[np.isfinite(intervals_0[:, 1])]]
     pdiagram_decolor_1 = [pdiagram_decolor[1]]
     pdiagram_decolor_2 = [pdiagram_decolor[2]]
 
-    SH0 = Silhouette(resolution=n0)
+    SH0 = _VectorizedSilhouette(resolution=n0, weight=_unit_weight)
     sh0 = SH0.fit_transform(pdiagram_decolor_0)
 
-    SH1 = Silhouette(resolution=n1, weight=weight)
+    SH1 = _VectorizedSilhouette(resolution=n1, weight=weight)
     sh1 = SH1.fit_transform(pdiagram_decolor_1)
 
-    SH2 = Silhouette(resolution=n2, weight=weight)
+    SH2 = _VectorizedSilhouette(resolution=n2, weight=weight)
     sh2 = SH2.fit_transform(pdiagram_decolor_2)
 
-    sh = list(sh0[0]) + list(sh1[0]) + list(sh2[0])
-    return sh
+    return np.concatenate((sh0[0], sh1[0], sh2[0]))
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from bodytda.mesh_utils import voxel_downsample
+
+
+def _voxel_downsample_reference(points, voxel_size):
+    order = np.argsort(-points[:, 2], kind="stable")
+    keys = np.floor(points[order] / voxel_size).astype(np.int64)
+    _, first = np.unique(keys, axis=0, return_index=True)
+    return points[np.sort(order[first])]
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("voxel_size", [0.05, 0.3, 10.0])
+def test_voxel_downsample_matches_unique_reference(dtype, voxel_size):
+    points = np.random.default_rng(0).normal(scale=2.0, size=(5000, 3)).astype(dtype)
+    np.testing.assert_array_equal(
+        voxel_downsample(points, voxel_size=voxel_size), _voxel_downsample_reference(points, voxel_size)
+    )
+
+
+def test_voxel_downsample_keeps_first_highest_point_on_ties():
+    points = np.array([[0.1, 0.1, 0.5], [0.2, 0.2, 0.5], [0.3, 0.3, 0.2], [-0.1, 0.1, 0.5]])
+    np.testing.assert_array_equal(voxel_downsample(points, voxel_size=1.0), points[[0, 3]])
+
+
+def test_voxel_downsample_empty():
+    assert voxel_downsample(np.empty((0, 3)), voxel_size=0.1).shape == (0, 3)
+
+
+@pytest.mark.parametrize("voxel_size", [0.0, -0.1, np.nan])
+def test_voxel_downsample_rejects_non_positive_voxel_size(voxel_size):
+    with pytest.raises(ValueError):
+        voxel_downsample(np.zeros((3, 3)), voxel_size=voxel_size)